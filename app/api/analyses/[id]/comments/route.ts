@@ -0,0 +1,22 @@
+import { type NextRequest, NextResponse } from "next/server"
+import { backendEndpoint } from "@/lib/backend"
+
+export const runtime = "nodejs"
+export const dynamic = "force-dynamic"
+
+export async function GET(request: NextRequest, { params }: { params: Promise<{ id: string }> }) {
+  try {
+    const { id } = await params
+    const url = backendEndpoint(`/analyses/${encodeURIComponent(id)}/comments`)
+    url.search = request.nextUrl.search
+
+    const response = await fetch(url)
+    return new Response(response.body, {
+      status: response.status,
+      headers: { "content-type": response.headers.get("content-type") || "application/json" },
+    })
+  } catch (error) {
+    console.error("Comment query error:", error)
+    return NextResponse.json({ error: "Failed to load comments" }, { status: 500 })
+  }
+}
@@ -1,33 +1,148 @@
+import type http from "node:http"
+import { Readable, Transform, pipeline } from "node:stream"
+import type { ReadableStream as NodeReadableStream } from "node:stream/web"
 import { type NextRequest, NextResponse } from "next/server"
+import { backendEndpoint, backendUrl, keepAliveAgent, transport } from "@/lib/backend"
+
+export const runtime = "nodejs"
+export const dynamic = "force-dynamic"
+
+const limitsUrl = backendEndpoint("/limits")
+
+const MAX_UPLOAD_BYTES = Number(process.env.MAX_UPLOAD_BYTES || 50 * 1024 * 1024)
+const BACKEND_TIMEOUT_MS = Number(process.env.BACKEND_TIMEOUT_MS || 10 * 60 * 1000)
+// Time for the upload itself and for the model batch still running when the
+// backend deadline passes, so the backend can answer with its own 504 first
+const BACKEND_TIMEOUT_MARGIN_MS = Number(process.env.BACKEND_TIMEOUT_MARGIN_MS || 60 * 1000)
+
+interface ProxyLimits {
+  maxUploadBytes: number
+  timeoutMs: number
+}
+
+// Connection-specific headers that must not be forwarded by a proxy
+const HOP_BY_HOP_HEADERS = new Set([
+  "connection",
+  "keep-alive",
+  "proxy-authenticate",
+  "proxy-authorization",
+  "te",
+  "trailer",
+  "transfer-encoding",
+  "upgrade",
+])
+
+class UploadTooLargeError extends Error {}
+class BackendTimeoutError extends Error {}
+
+let limitsPromise: Promise<ProxyLimits> | null = null
+
+// Use the stricter of our own upload limit and the backend's. The backend
+// enforces its own timeout, so ours only needs to outlast it
+function getLimits(): Promise<ProxyLimits> {
+  if (!limitsPromise) {
+    limitsPromise = fetch(limitsUrl, { signal: AbortSignal.timeout(5000) })
+      .then((response) => (response.ok ? response.json() : {}))
+      .catch(() => {
+        limitsPromise = null
+        return {}
+      })
+      .then((advertised) => ({
+        maxUploadBytes: Math.min(MAX_UPLOAD_BYTES, advertised.maxUploadBytes ?? Infinity),
+        timeoutMs:
+          advertised.requestTimeoutSeconds === undefined
+            ? BACKEND_TIMEOUT_MS
+            : advertised.requestTimeoutSeconds * 1000 + BACKEND_TIMEOUT_MARGIN_MS,
+      }))
+  }
+  return limitsPromise
+}
+
+function errorResponse(error: unknown) {
+  if (error instanceof UploadTooLargeError) {
+    return NextResponse.json({ error: "File too large" }, { status: 413 })
+  }
+  if (error instanceof BackendTimeoutError) {
+    return NextResponse.json({ error: "Analysis timed out" }, { status: 504 })
+  }
+  console.error("Analysis error:", error)
+  return NextResponse.json({ error: "Analysis failed" }, { status: 500 })
+}
 
 export async function POST(request: NextRequest) {
-  try {
-    const formData = await request.formData()
-    const file = formData.get("file") as File
+  const contentType = request.headers.get("content-type") || ""
+  if (!request.body || !contentType.startsWith("multipart/form-data")) {
+    return NextResponse.json({ error: "No file provided" }, { status: 400 })
+  }
+
+  const { maxUploadBytes, timeoutMs } = await getLimits()
+  const contentLength = request.headers.get("content-length")
+  if (contentLength && Number(contentLength) > maxUploadBytes) {
+    return errorResponse(new UploadTooLargeError())
+  }
+
+  // Count bytes as they stream through, since Content-Length may be absent
+  let received = 0
+  const limiter = new Transform({
+    transform(chunk, _encoding, callback) {
+      received += chunk.length
+      callback(received > maxUploadBytes ? new UploadTooLargeError() : null, chunk)
+    },
+  })
 
-    if (!file) {
-      return NextResponse.json({ error: "No file provided" }, { status: 400 })
+  return new Promise<Response>((resolve) => {
+    let settled = false
+    const settle = (response: Response) => {
+      if (!settled) {
+        settled = true
+        resolve(response)
+      }
     }
 
-    const pythonFormData = new FormData()
-    pythonFormData.append("file", file)
+    const headers: http.OutgoingHttpHeaders = { "content-type": contentType }
+    if (contentLength) {
+      headers["content-length"] = contentLength
+    }
+
+    const backendRequest = transport.request(backendUrl, { method: "POST", agent: keepAliveAgent, headers })
+    const timer = setTimeout(() => backendRequest.destroy(new BackendTimeoutError()), timeoutMs)
 
-    // Replace with your Colab ngrok URL
-    const pythonBackendUrl = process.env.PYTHON_BACKEND_URL || "https://5a422dbe0527.ngrok-free.app/analyze"
+    backendRequest.on("response", (backendResponse) => {
+      backendResponse.on("close", () => clearTimeout(timer))
 
-    const response = await fetch(pythonBackendUrl, {
-      method: "POST",
-      body: pythonFormData,
+      // Pass the backend body (JSON or NDJSON) and headers such as
+      // Retry-After through without re-parsing them
+      const responseHeaders = new Headers()
+      for (const [name, value] of Object.entries(backendResponse.headers)) {
+        if (value === undefined || HOP_BY_HOP_HEADERS.has(name)) {
+          continue
+        }
+        for (const item of Array.isArray(value) ? value : [value]) {
+          responseHeaders.append(name, item)
+        }
+      }
+      settle(
+        new Response(Readable.toWeb(backendResponse) as ReadableStream, {
+          status: backendResponse.statusCode,
+          headers: responseHeaders,
+        }),
+      )
     })
 
-    if (!response.ok) {
-      throw new Error(`Python backend error: ${response.statusText}`)
-    }
+    // Still needed once the upload has finished and pipeline has let go,
+    // e.g. when the timeout fires while waiting for the response
+    backendRequest.on("error", (error) => {
+      clearTimeout(timer)
+      settle(errorResponse(error))
+    })
 
-    const analysisResults = await response.json()
-    return NextResponse.json(analysisResults)
-  } catch (error) {
-    console.error("Analysis error:", error)
-    return NextResponse.json({ error: "Analysis failed" }, { status: 500 })
-  }
+    // pipeline forwards errors from every stage (client abort, size limit,
+    // backend failure) and destroys the others
+    pipeline(Readable.fromWeb(request.body as NodeReadableStream), limiter, backendRequest, (error) => {
+      if (error) {
+        clearTimeout(timer)
+        settle(errorResponse(error))
+      }
+    })
+  })
 }
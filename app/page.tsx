@@ -9,12 +9,15 @@ export default function HomePage() {
   const [analysisData, setAnalysisData] = useState(null)
   const [isLoading, setIsLoading] = useState(false)
 
-  const handleFileUpload = async (file: File) => {
+  const handleFileUpload = async (file: File, session?: string) => {
     setIsLoading(true)
 
     try {
       const formData = new FormData()
       formData.append("file", file)
+      if (session) {
+        formData.append("session", session)
+      }
 
       const response = await fetch("/api/analyze", {
         method: "POST",
@@ -0,0 +1,157 @@
+"""
+Near-duplicate detection for consultation comments.
+
+Form-letter campaigns produce thousands of almost identical submissions. This
+module groups them with MinHash signatures and locality-sensitive hashing so
+the expensive models only need to run once per cluster representative.
+"""
+
+import re
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Shingle / signature parameters
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = re.sub(r"[^a-z0-9\s]", " ", str(text).lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text: str) -> Set[int]:
+    """Return the set of hashed character shingles of a normalized text"""
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {
+        zlib.crc32(text[i:i + SHINGLE_SIZE].encode("utf-8"))
+        for i in range(len(text) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(shingle_set: Set[int]) -> np.ndarray:
+    """Compute the MinHash signature of a set of hashed shingles"""
+    values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    hashed = (np.outer(values, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return hashed.min(axis=0)
+
+
+def text_signature(text: str) -> np.ndarray:
+    """MinHash signature of a raw text"""
+    return minhash_signature(shingles(normalize_text(text)))
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of agreeing MinHash values"""
+    return np.count_nonzero(a == b) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """
+    Greedy LSH clustering of texts.
+
+    Each added text is compared against the representatives already in the
+    index. LSH buckets provide candidates, which are confirmed by the
+    agreement of their MinHash signatures, an estimate of the Jaccard
+    similarity of their shingle sets. Texts that match no representative
+    above the threshold become new representatives. Only the signature of
+    each representative is kept, so memory grows with the number of
+    clusters rather than with the length of the texts.
+
+    Texts only join clusters of the same ``group`` (e.g. the sentiment label),
+    so near-identical templates with opposite stances stay apart.
+
+    Representatives stored outside the index (e.g. from an earlier upload of
+    the same session) are found through ``lookup``. It is called once per
+    chunk of texts in ``add_all`` with a set of ``(band, key)`` pairs and
+    returns ``(band, key, cluster_id, representative_text, group)`` rows,
+    which are merged into the in-memory buckets. New clusters are numbered
+    from ``first_cluster_id``.
+    """
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        first_cluster_id: int = 0,
+        lookup: Optional[Callable[[Set[Tuple[int, bytes]]], Iterable[Tuple[int, bytes, int, str, str]]]] = None,
+    ):
+        self.threshold = threshold
+        self.lookup = lookup
+        self.next_cluster_id = first_cluster_id
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(LSH_BANDS)]
+        self.rep_signatures: Dict[int, np.ndarray] = {}
+        self.rep_groups: Dict[int, str] = {}
+        # Band keys of the clusters created by this index, for persisting
+        self.new_clusters: Dict[int, List[bytes]] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+            for band in range(LSH_BANDS)
+        ]
+
+    def _load_external(self, pairs: Set[Tuple[int, bytes]]) -> None:
+        """Merge stored clusters sharing any of the given band keys into the buckets"""
+        for band, key, cluster_id, rep_text, rep_group in self.lookup(pairs):
+            if cluster_id not in self.rep_signatures:
+                self.rep_signatures[cluster_id] = text_signature(rep_text)
+                self.rep_groups[cluster_id] = rep_group
+            bucket = self.buckets[band].setdefault(key, [])
+            if cluster_id not in bucket:
+                bucket.append(cluster_id)
+
+    def _add(self, signature: np.ndarray, group: str) -> int:
+        keys = self._band_keys(signature)
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best_cluster, best_score = -1, self.threshold
+        for cluster_id in candidates:
+            if self.rep_groups[cluster_id] != group:
+                continue
+            score = signature_similarity(signature, self.rep_signatures[cluster_id])
+            if score >= best_score:
+                best_cluster, best_score = cluster_id, score
+
+        if best_cluster < 0:
+            best_cluster = self.next_cluster_id
+            self.next_cluster_id += 1
+            self.rep_signatures[best_cluster] = signature
+            self.rep_groups[best_cluster] = group
+            self.new_clusters[best_cluster] = keys
+            for band, key in enumerate(keys):
+                self.buckets[band].setdefault(key, []).append(best_cluster)
+        return best_cluster
+
+    def add_all(self, texts: List[str], groups: List[str]) -> List[int]:
+        """Add texts in order and return the id of the cluster each belongs to"""
+        cluster_ids = []
+        for start in range(0, len(texts), self.LOOKUP_CHUNK):
+            signatures = [text_signature(text) for text in texts[start:start + self.LOOKUP_CHUNK]]
+
+            if self.lookup is not None:
+                self._load_external({
+                    (band, key)
+                    for signature in signatures
+                    for band, key in enumerate(self._band_keys(signature))
+                })
+
+            for signature, group in zip(signatures, groups[start:start + self.LOOKUP_CHUNK]):
+                cluster_ids.append(self._add(signature, group))
+        return cluster_ids
@@ -0,0 +1,213 @@
+"""
+Per-process memory governor for the analysis backend.
+
+Watches the resident set size (RSS) of the server above its baseline (the
+memory held once the models are loaded) and uses it to
+- admit, queue or reject new uploads against a memory budget,
+- shrink model batch sizes under memory pressure and grow them back later.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import gc
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # Fall back to /proc on Linux
+    psutil = None
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes, or 0 if unavailable"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def total_memory() -> int:
+    """Physical memory of the machine in bytes, or 0 if unavailable"""
+    if psutil is not None:
+        return psutil.virtual_memory().total
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, AttributeError):
+        return 0
+
+
+def _load_malloc_trim():
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6").malloc_trim
+    except (OSError, AttributeError):  # Not glibc
+        return None
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def release_memory() -> None:
+    """Collect garbage and return freed heap pages to the OS where supported"""
+    gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+
+
+class ServiceOverloaded(Exception):
+    """Raised when an upload cannot be admitted within the memory budget"""
+
+
+class ResourceGovernor:
+    """
+    Tracks memory use against a budget.
+
+    The budget is headroom above ``baseline_bytes``, the RSS of the idle
+    process with its models loaded, and RSS may never exceed
+    ``ceiling_bytes`` in absolute terms. Above ``soft_ratio`` of either limit
+    the process is under pressure and batch sizes are halved. New analyses
+    wait in a bounded queue until a slot is free and memory is within both
+    limits, and are rejected if that does not happen within
+    ``queue_timeout`` seconds.
+
+    Freed memory is released to the OS before an analysis waits. When no
+    analysis is running and usage is still over budget, whatever is resident
+    becomes the new baseline, so memory the allocator keeps after an upload
+    cannot lock the service out; above the ceiling the analysis is rejected
+    instead. The baseline drops back, but never below its initial value, as
+    usage falls.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        baseline_bytes: int = 0,
+        ceiling_bytes: int = 0,
+        soft_ratio: float = 0.8,
+        max_batch_size: int = 8,
+        max_concurrent: int = 1,
+        max_queued: int = 4,
+        queue_timeout: float = 30.0,
+    ):
+        self.budget_bytes = budget_bytes
+        self.baseline_bytes = baseline_bytes
+        self.min_baseline_bytes = baseline_bytes
+        self.ceiling_bytes = ceiling_bytes
+        self.soft_limit_bytes = int(budget_bytes * soft_ratio)
+        self.soft_ceiling_bytes = int(ceiling_bytes * soft_ratio)
+        self.max_batch_size = max_batch_size
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+
+        self.batch_size = max_batch_size
+        self.peak_rss = 0
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.batch_shrinks = 0
+        self.rebaselines = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def rss(self) -> int:
+        rss = current_rss()
+        self.peak_rss = max(self.peak_rss, rss)
+        if rss < self.baseline_bytes:
+            self.baseline_bytes = max(self.min_baseline_bytes, rss)
+        return rss
+
+    def usage(self) -> int:
+        """Bytes resident above the baseline"""
+        return max(0, self.rss() - self.baseline_bytes)
+
+    def over_ceiling(self) -> bool:
+        return self.ceiling_bytes > 0 and self.rss() >= self.ceiling_bytes
+
+    def under_pressure(self) -> bool:
+        return (self.budget_bytes > 0 and self.usage() >= self.soft_limit_bytes) or (
+            self.ceiling_bytes > 0 and self.rss() >= self.soft_ceiling_bytes
+        )
+
+    def over_budget(self) -> bool:
+        return (self.budget_bytes > 0 and self.usage() >= self.budget_bytes) or self.over_ceiling()
+
+    def next_batch_size(self) -> int:
+        """Adapt the batch size to the current memory pressure and return it"""
+        if self.under_pressure():
+            if self.batch_size > 1:
+                self.batch_size = max(1, self.batch_size // 2)
+                self.batch_shrinks += 1
+        elif self.batch_size < self.max_batch_size:
+            self.batch_size += 1
+        return self.batch_size
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold an analysis slot, waiting while the process is over budget"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise ServiceOverloaded("Too many analyses queued")
+
+        deadline = time.monotonic() + self.queue_timeout
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ServiceOverloaded("Timed out waiting for an analysis slot")
+        finally:
+            self.queued -= 1
+
+        try:
+            while self.over_budget():
+                release_memory()
+                if not self.over_budget():
+                    break
+                if self.active == 0:
+                    # Nothing is running, so waiting would not free anything
+                    if self.over_ceiling():
+                        self.rejected += 1
+                        raise ServiceOverloaded("Memory ceiling exceeded")
+                    self.baseline_bytes = self.rss()
+                    self.rebaselines += 1
+                    break
+                if time.monotonic() >= deadline:
+                    self.rejected += 1
+                    raise ServiceOverloaded("Memory budget exceeded")
+                await asyncio.sleep(0.5)
+
+            self.active += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rssBytes": self.rss(),
+            "peakRssBytes": self.peak_rss,
+            "baselineBytes": self.baseline_bytes,
+            "usageBytes": self.usage(),
+            "budgetBytes": self.budget_bytes,
+            "ceilingBytes": self.ceiling_bytes,
+            "softLimitBytes": self.soft_limit_bytes,
+            "underPressure": self.under_pressure(),
+            "activeAnalyses": self.active,
+            "queuedAnalyses": self.queued,
+            "rejectedAnalyses": self.rejected,
+            "batchSize": self.batch_size,
+            "maxBatchSize": self.max_batch_size,
+            "batchShrinks": self.batch_shrinks,
+            "rebaselines": self.rebaselines,
+        }
+
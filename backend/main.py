@@ -1,6 +1,7 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 import pandas as pd
 import io
 import base64
@@ -13,9 +14,13 @@ from nltk.corpus import opinion_lexicon
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import nltk
 import re
+import time
 import uvicorn
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
+from dedup import NearDuplicateIndex
+from governor import ResourceGovernor, ServiceOverloaded, current_rss, total_memory
+import results_store
 
 # Download required NLTK data
 try:
@@ -42,6 +47,42 @@ summarizer = pipeline("summarization", model="knkarthick/MEETING_SUMMARY")
 urgency_classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
 print("Models loaded successfully!")
 
+# Comments at or above this shingle similarity are treated as one submission
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+# Request limits, advertised on /limits so the Next.js proxy can match them
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+REQUEST_TIMEOUT_SECONDS = int(os.getenv("REQUEST_TIMEOUT_SECONDS", "600"))
+KEEP_ALIVE_SECONDS = int(os.getenv("KEEP_ALIVE_SECONDS", "65"))
+
+# Only the largest clusters are listed so the response size stays bounded
+MAX_LISTED_CLUSTERS = 50
+
+# Memory guardrails. The budget is headroom above the memory held once the
+# models are loaded, and defaults to 75% of physical memory minus that
+BASELINE_RSS_BYTES = current_rss()
+MEMORY_BUDGET_BYTES = int(os.getenv("MEMORY_BUDGET_MB", "0")) * 1024 * 1024 or max(
+    0, int(total_memory() * 0.75) - BASELINE_RSS_BYTES
+)
+# Absolute limit on RSS, however the baseline moves
+MEMORY_CEILING_BYTES = int(os.getenv("MEMORY_CEILING_MB", "0")) * 1024 * 1024 or int(total_memory() * 0.9)
+governor = ResourceGovernor(
+    MEMORY_BUDGET_BYTES,
+    baseline_bytes=BASELINE_RSS_BYTES,
+    ceiling_bytes=MEMORY_CEILING_BYTES,
+    soft_ratio=float(os.getenv("MEMORY_SOFT_RATIO", "0.8")),
+    max_batch_size=int(os.getenv("MAX_BATCH_SIZE", "8")),
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_ANALYSES", "1")),
+    max_queued=int(os.getenv("MAX_QUEUED_ANALYSES", "4")),
+    queue_timeout=float(os.getenv("QUEUE_TIMEOUT_SECONDS", "30"))
+)
+
+# Texts per word-frequency pass, so the corpus is never joined into one string
+WORD_COUNT_CHUNK = 1000
+
+results_store.init_db()
+results_store.delete_expired_analyses()
+
 def sentiment_analysis(text: str) -> tuple:
     """Analyze sentiment of a single text"""
     try:
@@ -63,65 +104,150 @@ def generate_summary(text: str) -> str:
         print(f"Error in summarization: {e}")
         return "Unable to generate summary"
 
+URGENCY_LABELS = ["critical", "moderate", "minor"]
+
+def prepare_urgency(text: str, sentiment_label: str) -> tuple:
+    """
+    Return the urgency to use without the classifier and the cleaned text to
+    classify, which is None when the classifier should not run
+    """
+    # If positive, no urgency; the model may report labels in either case
+    if str(sentiment_label).upper() == "POSITIVE":
+        return "Not Applicable", None
+
+    # Clean text
+    cleaned = re.sub(r"[^a-zA-Z0-9\s]", "", str(text))
+    return "minor", cleaned if cleaned.strip() else None
+
 def detect_urgency(text: str, sentiment_label: str) -> str:
     """Detect urgency level based on text and sentiment"""
+    urgency, cleaned = prepare_urgency(text, sentiment_label)
+    if cleaned is None:
+        return urgency
     try:
-        # If positive, no urgency
-        if sentiment_label == "POSITIVE":
-            return "Not Applicable"
-        
-        # Clean text
-        text = re.sub(r"[^a-zA-Z0-9\s]", "", str(text))
-        if not text.strip():
-            return "minor"
-
-        urgency_labels = ["critical", "moderate", "minor"]
-        result = urgency_classifier(text, urgency_labels)
+        result = urgency_classifier(cleaned, URGENCY_LABELS)
         return result["labels"][0]
     except Exception as e:
         print(f"Error in urgency detection: {e}")
         return "minor"
 
-def generate_wordcloud(text: str) -> str:
-    """Generate word cloud and return as base64 encoded image"""
+def sentiment_batch(texts: List[str], batch_size: int) -> List[tuple]:
+    """Analyze sentiment of a batch of texts"""
     try:
-        # Clean text
-        text_clean = re.sub(r"[^a-z\s]", "", text.lower())
-        
-        # Get opinion words
-        pos_words = set(opinion_lexicon.positive())
-        neg_words = set(opinion_lexicon.negative())
-        all_sentiment_words = pos_words.union(neg_words)
-        
-        # Keep only sentiment words
-        sentiment_tokens = [w for w in text_clean.split() if w in all_sentiment_words]
-        
-        # Filter with VADER for strong sentiment words
+        return [
+            (result["label"], round(result["score"], 2))
+            for result in sentiment_pipe(texts, batch_size=batch_size)
+        ]
+    except Exception as e:
+        print(f"Error in batch sentiment analysis, retrying per text: {e}")
+        return [sentiment_analysis(text) for text in texts]
+
+def summarize_batch(texts: List[str], sentiment_labels: List[str], batch_size: int) -> List[Dict[str, Any]]:
+    """Run the summary and urgency models over a batch of texts"""
+    try:
+        summaries = [
+            result["summary_text"]
+            for result in summarizer(
+                [text[:1000] for text in texts],
+                max_length=100, min_length=30, do_sample=False, batch_size=batch_size
+            )
+        ]
+    except Exception as e:
+        print(f"Error in batch summarization, retrying per text: {e}")
+        summaries = [generate_summary(text) for text in texts]
+
+    # Only non-positive texts with content go through the urgency classifier
+    urgencies = []
+    pending = []
+    for i, (text, label) in enumerate(zip(texts, sentiment_labels)):
+        urgency, cleaned = prepare_urgency(text, label)
+        urgencies.append(urgency)
+        if cleaned is not None:
+            pending.append((i, cleaned))
+    if pending:
+        try:
+            classified = urgency_classifier([text for _, text in pending], URGENCY_LABELS, batch_size=batch_size)
+            if isinstance(classified, dict):
+                classified = [classified]
+            for (i, _), result in zip(pending, classified):
+                urgencies[i] = result["labels"][0]
+        except Exception as e:
+            print(f"Error in batch urgency detection, retrying per text: {e}")
+            for i, _ in pending:
+                urgencies[i] = detect_urgency(texts[i], sentiment_labels[i])
+
+    return [
+        {"summary": summary, "urgency": urgency}
+        for summary, urgency in zip(summaries, urgencies)
+    ]
+
+class AnalysisTimeout(Exception):
+    """Raised when an analysis runs past REQUEST_TIMEOUT_SECONDS"""
+
+def in_batches(items: List[Any], deadline: float):
+    """Yield slices of items sized to the current memory pressure, stopping at the deadline"""
+    start = 0
+    while start < len(items):
+        if time.monotonic() >= deadline:
+            raise AnalysisTimeout(f"Analysis exceeded {REQUEST_TIMEOUT_SECONDS} seconds")
+        batch = items[start:start + governor.next_batch_size()]
+        yield batch
+        start += len(batch)
+
+WORDCLOUD_OPTIONS = dict(
+    width=1000, height=600,
+    background_color="white",
+    colormap="viridis",
+    prefer_horizontal=0.9,
+    max_words=80,
+    min_font_size=12,
+    contour_color="black", 
+    contour_width=1,
+    relative_scaling=0.5,
+    normalize_plurals=True
+)
+
+# Only the most frequent words can appear in the cloud
+WORDCLOUD_CANDIDATE_WORDS = 4 * WORDCLOUD_OPTIONS["max_words"]
+
+_strong_sentiment_words = None
+
+def strong_sentiment_words() -> set:
+    """Opinion lexicon words with a strong VADER polarity, computed once"""
+    global _strong_sentiment_words
+    if _strong_sentiment_words is None:
         sia = SentimentIntensityAnalyzer()
-        filtered_tokens = [
-            w for w in sentiment_tokens 
+        all_sentiment_words = set(opinion_lexicon.positive()).union(opinion_lexicon.negative())
+        _strong_sentiment_words = {
+            w for w in all_sentiment_words
             if abs(sia.polarity_scores(w)["compound"]) >= 0.41
-        ]
-        
-        sentiment_text = " ".join(filtered_tokens)
+        }
+    return _strong_sentiment_words
+
+def word_frequencies(text: str) -> Dict[bool, Dict[str, int]]:
+    """Count strong sentiment words (True) and all words (False) in a text"""
+    try:
+        # Clean text
+        text_clean = re.sub(r"[^a-z\s]", "", text.lower())
         
-        if not sentiment_text.strip():
-            # Fallback to original text if no sentiment words found
-            sentiment_text = text_clean
+        # Keep only strong sentiment words
+        sentiment_words = strong_sentiment_words()
+        sentiment_text = " ".join(w for w in text_clean.split() if w in sentiment_words)
         
+        wc = WordCloud(**WORDCLOUD_OPTIONS)
+        return {
+            True: wc.process_text(sentiment_text) if sentiment_text.strip() else {},
+            False: wc.process_text(text_clean) if text_clean.strip() else {}
+        }
+    except Exception as e:
+        print(f"Error counting words: {e}")
+        return {True: {}, False: {}}
+
+def generate_wordcloud(frequencies: Dict[str, int]) -> str:
+    """Generate word cloud from word frequencies and return as base64 encoded image"""
+    try:
         # Generate word cloud
-        wc = WordCloud(
-            width=1000, height=600,
-            background_color="white",
-            colormap="viridis",
-            prefer_horizontal=0.9,
-            max_words=80,
-            min_font_size=12,
-            contour_color="black", 
-            contour_width=1,
-            relative_scaling=0.5,
-            normalize_plurals=True
-        ).generate(sentiment_text)
+        wc = WordCloud(**WORDCLOUD_OPTIONS).generate_from_frequencies(frequencies)
         
         # Convert to base64
         plt.figure(figsize=(12, 7))
@@ -140,94 +266,283 @@ def generate_wordcloud(text: str) -> str:
         print(f"Error generating word cloud: {e}")
         return ""
 
+def empty_aggregates() -> Dict[str, Any]:
+    """Aggregates of an analysis without any comments"""
+    return {
+        "sentimentAnalysis": {"positive": 0, "negative": 0, "neutral": 0, "totalComments": 0},
+        "wordCloud": {"image": "", "format": "base64"},
+        "urgencyAnalysis": {"critical": 0, "moderate": 0, "minor": 0, "notApplicable": 0},
+        "averageSentimentScore": 0,
+        "clusterAnalysis": {"totalClusters": 0, "duplicateComments": 0, "clusters": []}
+    }
+
+URGENCY_KEYS = {
+    "critical": "critical",
+    "moderate": "moderate",
+    "minor": "minor",
+    "Not Applicable": "notApplicable"
+}
+
 @app.get("/")
 async def root():
     return {"message": "Sentiment Analysis API is running"}
 
-@app.post("/analyze")
-async def analyze_csv(file: UploadFile = File(...)):
-    try:
-        # Read CSV file
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        
-        # Check if 'review' column exists
-        if 'review' not in df.columns:
-            # Try common column names
-            possible_columns = ['comment', 'comments', 'text', 'feedback', 'response']
-            review_column = None
-            for col in possible_columns:
-                if col in df.columns:
-                    review_column = col
-                    break
-            
-            if review_column is None:
-                raise HTTPException(status_code=400, detail="No 'review' column found in CSV. Please ensure your CSV has a 'review' column or similar.")
-            
-            df = df.rename(columns={review_column: 'review'})
-        
-        # Process each review
-        results = []
-        all_text = ""
-        
-        for idx, row in df.iterrows():
-            review_text = str(row['review'])
-            all_text += review_text + " "
-            
-            # Analyze sentiment
-            sentiment_label, sentiment_score = sentiment_analysis(review_text)
-            
-            # Generate summary
-            summary = generate_summary(review_text)
-            
-            # Detect urgency
-            urgency = detect_urgency(review_text, sentiment_label)
-            
-            results.append({
-                "id": str(idx),
+@app.get("/limits")
+async def limits():
+    """Upload and timeout limits the frontend proxy should enforce"""
+    return {
+        "maxUploadBytes": MAX_UPLOAD_BYTES,
+        # End to end: waiting for a slot, then the analysis itself
+        "requestTimeoutSeconds": governor.queue_timeout + REQUEST_TIMEOUT_SECONDS,
+        "keepAliveSeconds": KEEP_ALIVE_SECONDS
+    }
+
+# Column holding the comments, in order of preference
+REVIEW_COLUMNS = ['review', 'comment', 'comments', 'text', 'feedback', 'response']
+
+def read_reviews(file: UploadFile) -> List[str]:
+    """
+    Parse the comments of an uploaded CSV. The upload is already spooled to
+    a temporary file, so it is parsed from there without another copy in
+    memory, and only the comment column is loaded.
+    """
+    file.file.seek(0, os.SEEK_END)
+    if file.file.tell() > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES} byte upload limit.")
+    file.file.seek(0)
+
+    df = pd.read_csv(file.file, encoding='utf-8', usecols=lambda column: column in REVIEW_COLUMNS)
+    review_column = next((col for col in REVIEW_COLUMNS if col in df.columns), None)
+    if review_column is None:
+        raise HTTPException(status_code=400, detail="No 'review' column found in CSV. Please ensure your CSV has a 'review' column or similar.")
+    return [str(text) for text in df[review_column]]
+
+def process_reviews(review_texts: List[str], session: Optional[str], deadline: float) -> Dict[str, Any]:
+    """
+    Analyze the unseen comments of an upload and return the response body.
+    Raises AnalysisTimeout before appending any comments once ``deadline``
+    (a time.monotonic() value) has passed.
+    """
+    # Unnamed analyses expire; drop old ones before adding another
+    results_store.delete_expired_analyses()
+
+    # Named sessions keep earlier results; only unseen comments are analyzed.
+    # New analyses are only created once their results are stored
+    analysis_id = results_store.find_analysis(session)
+
+    review_hashes = [results_store.comment_hash(text) for text in review_texts]
+    seen_counts = results_store.seen_hash_counts(analysis_id, review_hashes) if analysis_id else {}
+    new_reviews = []
+    for review_text, review_hash in zip(review_texts, review_hashes):
+        if seen_counts.get(review_hash, 0) > 0:
+            seen_counts[review_hash] -= 1
+        else:
+            new_reviews.append((review_text, review_hash))
+    del review_hashes, seen_counts
+
+    # Sentiment is cheap, so every comment gets its own
+    sentiments = []
+    for batch in in_batches([text for text, _ in new_reviews], deadline):
+        sentiments.extend(sentiment_batch(batch, len(batch)))
+
+    # Group near-duplicate comments (form-letter campaigns) with the same
+    # sentiment, including clusters stored by earlier uploads to this session
+    first_cluster_id = results_store.next_cluster_id(analysis_id) if analysis_id else 0
+    index = NearDuplicateIndex(
+        DEDUP_THRESHOLD,
+        first_cluster_id=first_cluster_id,
+        lookup=(lambda keys: results_store.find_cluster_candidates(analysis_id, keys)) if first_cluster_id else None
+    )
+    cluster_ids = index.add_all(
+        [review_text for review_text, _ in new_reviews], [label.lower() for label, _ in sentiments]
+    )
+    # Only the band keys of new clusters are needed from here on; free the
+    # buckets and signatures before the summary models run
+    new_clusters = index.new_clusters
+    del index
+    cluster_results = results_store.get_cluster_results(
+        analysis_id, {cluster_id for cluster_id in cluster_ids if cluster_id < first_cluster_id}
+    )
+
+    # Run the summary and urgency models once per new cluster representative,
+    # in batches sized to the current memory pressure
+    pending = []
+    for (review_text, _), (label, _), cluster_id in zip(new_reviews, sentiments, cluster_ids):
+        if cluster_id not in cluster_results:
+            cluster_results[cluster_id] = None
+            pending.append((cluster_id, review_text, label))
+    for batch in in_batches(pending, deadline):
+        batch_results = summarize_batch([text for _, text, _ in batch], [label for _, _, label in batch], len(batch))
+        for (cluster_id, _, _), result in zip(batch, batch_results):
+            cluster_results[cluster_id] = result
+    del pending
+
+    # Count the new comments only; the stored totals are updated with these
+    sentiment_counts = {}
+    urgency_counts = {}
+    score_delta = 0.0
+    cluster_sizes = {}
+    representatives = {}
+    for offset, ((label, score), cluster_id) in enumerate(zip(sentiments, cluster_ids)):
+        sentiment = label.lower()
+        sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
+        urgency_key = URGENCY_KEYS.get(cluster_results[cluster_id]["urgency"])
+        if urgency_key:
+            urgency_counts[urgency_key] = urgency_counts.get(urgency_key, 0) + 1
+        score_delta += score
+        cluster_sizes[cluster_id] = cluster_sizes.get(cluster_id, 0) + 1
+        if cluster_id in new_clusters:
+            representatives.setdefault(cluster_id, offset)
+
+    new_word_counts = {True: {}, False: {}}
+    for start in range(0, len(new_reviews), WORD_COUNT_CHUNK):
+        chunk_text = " ".join(text for text, _ in new_reviews[start:start + WORD_COUNT_CHUNK])
+        for sentiment_only, counts in word_frequencies(chunk_text).items():
+            merged = new_word_counts[sentiment_only]
+            for word, count in counts.items():
+                merged[word] = merged.get(word, 0) + count
+
+    # Fan the representative results out to every member as the rows are
+    # written, so they never all exist at once
+    def result_rows():
+        for offset, ((review_text, review_hash), (label, score), cluster_id) in enumerate(
+            zip(new_reviews, sentiments, cluster_ids)
+        ):
+            yield {
+                "offset": offset,
+                "commentHash": review_hash,
                 "originalComment": review_text,
-                "summary": summary,
-                "sentiment": sentiment_label.lower(),
-                "sentimentScore": sentiment_score,
-                "urgency": urgency
-            })
-        
-        # Calculate overall statistics
-        sentiment_counts = {}
-        for result in results:
-            sentiment = result["sentiment"]
-            sentiment_counts[sentiment] = sentiment_counts.get(sentiment, 0) + 1
-        
-        # Generate word cloud
-        wordcloud_image = generate_wordcloud(all_text)
-        
-        # Prepare response
-        analysis_data = {
-            "sentimentAnalysis": {
-                "positive": sentiment_counts.get("positive", 0),
-                "negative": sentiment_counts.get("negative", 0),
-                "neutral": sentiment_counts.get("neutral", 0),
-                "totalComments": len(results)
-            },
-            "summaries": results,
-            "wordCloud": {
-                "image": wordcloud_image,
-                "format": "base64"
-            },
-            "urgencyAnalysis": {
-                "critical": len([r for r in results if r["urgency"] == "critical"]),
-                "moderate": len([r for r in results if r["urgency"] == "moderate"]),
-                "minor": len([r for r in results if r["urgency"] == "minor"]),
-                "notApplicable": len([r for r in results if r["urgency"] == "Not Applicable"])
-            },
-            "averageSentimentScore": sum([r["sentimentScore"] for r in results]) / len(results) if results else 0
+                **cluster_results[cluster_id],
+                "sentiment": label.lower(),
+                "sentimentScore": score,
+                "clusterId": cluster_id
+            }
+
+    # Applied to the stored aggregates inside the same transaction that
+    # appends the comments, so concurrent uploads cannot lose updates
+    def update_aggregates(aggregates, score_sum, totals):
+        aggregates = aggregates or empty_aggregates()
+        sentiment_analysis_data = aggregates["sentimentAnalysis"]
+        for sentiment, count in sentiment_counts.items():
+            sentiment_analysis_data[sentiment] = sentiment_analysis_data.get(sentiment, 0) + count
+        sentiment_analysis_data["totalComments"] = totals["totalComments"]
+        for urgency_key, count in urgency_counts.items():
+            aggregates["urgencyAnalysis"][urgency_key] += count
+        score_sum += score_delta
+        aggregates["averageSentimentScore"] = (
+            score_sum / totals["totalComments"] if totals["totalComments"] else 0
+        )
+        # Per-comment results are served page by page
+        aggregates["clusterAnalysis"] = {
+            "totalClusters": totals["totalClusters"],
+            "duplicateComments": totals["totalComments"] - totals["totalClusters"],
+            "clusters": totals["clusters"]
         }
-        
+        return aggregates, score_sum
+
+    analysis_id, aggregates = results_store.append_results(
+        analysis_id, session, result_rows(), first_cluster_id, cluster_sizes, new_clusters, representatives,
+        new_word_counts, update_aggregates, MAX_LISTED_CLUSTERS
+    )
+    new_comments = len(new_reviews)
+
+    # Regenerate word cloud from the accumulated word frequencies
+    if new_comments:
+        frequencies = results_store.top_words(analysis_id, True, WORDCLOUD_CANDIDATE_WORDS)
+        if not frequencies:
+            # Fallback to all words if no sentiment words found
+            frequencies = results_store.top_words(analysis_id, False, WORDCLOUD_CANDIDATE_WORDS)
+        aggregates["wordCloud"] = {
+            "image": generate_wordcloud(frequencies) if frequencies else "",
+            "format": "base64"
+        }
+        results_store.save_word_cloud(analysis_id, aggregates["wordCloud"])
+
+    first_page = results_store.query_comments(analysis_id)
+
+    return {
+        "analysisId": analysis_id,
+        "session": session,
+        "newComments": new_comments,
+        **aggregates,
+        "summaries": first_page.pop("items"),
+        "summariesPage": first_page
+    }
+
+@app.post("/analyze")
+async def analyze_csv(file: UploadFile = File(...), session: Optional[str] = Form(None)):
+    try:
+        # Wait for memory headroom before parsing the upload
+        async with governor.admit():
+            deadline = time.monotonic() + REQUEST_TIMEOUT_SECONDS
+            review_texts = await run_in_threadpool(read_reviews, file)
+
+            session = session.strip() if session else None
+            analysis_data = await run_in_threadpool(process_reviews, review_texts, session, deadline)
+
         return JSONResponse(content=analysis_data)
         
+    except AnalysisTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ServiceOverloaded as e:
+        raise HTTPException(status_code=503, detail=f"Server is busy: {e}", headers={"Retry-After": "30"})
+    except results_store.AnalysisNotFound:
+        raise HTTPException(status_code=409, detail="The session was deleted during the analysis.")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error processing file: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+@app.get("/metrics/memory")
+async def memory_metrics():
+    """Memory counters of the resource governor"""
+    return governor.stats()
+
+@app.get("/sessions")
+async def get_sessions():
+    """List the named analysis sessions"""
+    return {"sessions": results_store.list_sessions()}
+
+@app.get("/analyses/{analysis_id}")
+async def get_analysis(analysis_id: str):
+    """Return the aggregate results of a stored analysis"""
+    aggregates = results_store.get_aggregates(analysis_id)
+    if aggregates is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return {"analysisId": analysis_id, **aggregates}
+
+@app.delete("/analyses/{analysis_id}")
+async def delete_analysis(analysis_id: str):
+    """Delete a stored analysis or session with all its comments"""
+    if not results_store.delete_analysis(analysis_id):
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return {"deleted": analysis_id}
+
+@app.get("/analyses/{analysis_id}/comments")
+async def get_analysis_comments(
+    analysis_id: str,
+    page: int = Query(1, ge=1),
+    pageSize: int = Query(results_store.DEFAULT_PAGE_SIZE, ge=1, le=results_store.MAX_PAGE_SIZE),
+    sentiment: Optional[str] = None,
+    urgency: Optional[str] = None,
+    search: Optional[str] = None,
+    sort: str = Query("position", pattern="^(position|sentimentScore)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$")
+):
+    """Page through the per-comment results of a stored analysis"""
+    if results_store.get_aggregates(analysis_id) is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return results_store.query_comments(
+        analysis_id,
+        page=page,
+        page_size=pageSize,
+        sentiment=sentiment,
+        urgency=urgency,
+        search=search,
+        sort=sort,
+        order=order
+    )
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=KEEP_ALIVE_SECONDS)
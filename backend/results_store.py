@@ -0,0 +1,536 @@
+"""
+Server-side storage for analysis results.
+
+Per-comment results are kept in SQLite so the frontend can page, filter and
+search through them instead of receiving every comment in one response.
+Analyses can be named sessions: later uploads are appended to them, and the
+stored cluster index, counters and word frequencies are updated in place so
+only unseen comments need to be analyzed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.db"))
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+SORT_COLUMNS = {
+    "position": "c.position",
+    "sentimentScore": "c.sentiment_score",
+}
+
+SCHEMA_VERSION = 4
+
+# Unnamed analyses are only kept this long after their last update
+UNNAMED_ANALYSIS_TTL_HOURS = float(os.getenv("UNNAMED_ANALYSIS_TTL_HOURS", "24"))
+
+# The trigram tokenizer indexes substrings of at least this many characters
+FTS_MIN_SEARCH_LENGTH = 3
+
+# Bound on the number of SQL variables in a single IN (...) query
+_IN_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    name TEXT UNIQUE,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    aggregates TEXT NOT NULL,
+    score_sum REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS comments (
+    row_id INTEGER PRIMARY KEY,
+    analysis_id TEXT NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    comment_hash TEXT NOT NULL,
+    original_comment TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    sentiment_score REAL NOT NULL,
+    urgency TEXT NOT NULL,
+    cluster_id INTEGER NOT NULL,
+    UNIQUE (analysis_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_comments_hash ON comments (analysis_id, comment_hash);
+CREATE INDEX IF NOT EXISTS idx_comments_score ON comments (analysis_id, sentiment_score);
+CREATE INDEX IF NOT EXISTS idx_comments_sentiment ON comments (analysis_id, sentiment, sentiment_score);
+CREATE INDEX IF NOT EXISTS idx_comments_urgency ON comments (analysis_id, urgency, sentiment_score);
+CREATE TABLE IF NOT EXISTS clusters (
+    analysis_id TEXT NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    cluster_id INTEGER NOT NULL,
+    representative_position INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (analysis_id, cluster_id)
+);
+CREATE INDEX IF NOT EXISTS idx_clusters_size ON clusters (analysis_id, size);
+CREATE TABLE IF NOT EXISTS cluster_bands (
+    analysis_id TEXT NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    band INTEGER NOT NULL,
+    band_key BLOB NOT NULL,
+    cluster_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cluster_bands ON cluster_bands (analysis_id, band, band_key);
+CREATE TABLE IF NOT EXISTS word_counts (
+    analysis_id TEXT NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+    sentiment_only INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (analysis_id, sentiment_only, word)
+);
+CREATE INDEX IF NOT EXISTS idx_word_counts ON word_counts (analysis_id, sentiment_only, count);
+"""
+
+_COMMENT_INDEXES = ["idx_comments_hash", "idx_comments_score", "idx_comments_sentiment", "idx_comments_urgency"]
+
+# Substring search index over comments and summaries (needs SQLite 3.34+).
+# It refers to comments by row_id, which unlike an implicit rowid is stable
+# across VACUUM.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5 (
+    original_comment, summary, analysis_id UNINDEXED,
+    content='comments', content_rowid='row_id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS comments_fts_insert AFTER INSERT ON comments BEGIN
+    INSERT INTO comments_fts (rowid, original_comment, summary, analysis_id)
+    VALUES (new.row_id, new.original_comment, new.summary, new.analysis_id);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_fts_delete AFTER DELETE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, original_comment, summary, analysis_id)
+    VALUES ('delete', old.row_id, old.original_comment, old.summary, old.analysis_id);
+END;
+"""
+
+_fts_enabled = False
+
+
+@contextmanager
+def _connect(immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Open a connection that commits on success, rolls back on error and is
+    always closed. With ``immediate`` the transaction takes the write lock
+    up front, so reads inside it cannot be invalidated by other writers.
+    """
+    conn = sqlite3.connect(RESULTS_DB_PATH)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        with conn:
+            if immediate:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+    finally:
+        conn.close()
+
+
+def init_db() -> None:
+    """Create the results tables, replacing stores from before sessions existed"""
+    global _fts_enabled
+    with _connect() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 2:
+            # Version 1 results cannot be appended to, so they are discarded
+            conn.executescript("DROP TABLE IF EXISTS comments; DROP TABLE IF EXISTS analyses;")
+        elif version < 4:
+            # Give comments an explicit row_id for the search index to refer to
+            conn.executescript(
+                "DROP TRIGGER IF EXISTS comments_fts_insert; DROP TRIGGER IF EXISTS comments_fts_delete;"
+                "DROP TABLE IF EXISTS comments_fts;"
+                + "".join(f"DROP INDEX IF EXISTS {name};" for name in _COMMENT_INDEXES)
+                + "ALTER TABLE comments RENAME TO comments_old;"
+            )
+        conn.executescript(_SCHEMA)
+        if 2 <= version < 4:
+            conn.executescript(
+                """INSERT INTO comments (analysis_id, position, id, comment_hash, original_comment, summary,
+                       sentiment, sentiment_score, urgency, cluster_id)
+                   SELECT analysis_id, position, id, comment_hash, original_comment, summary,
+                       sentiment, sentiment_score, urgency, cluster_id
+                   FROM comments_old ORDER BY analysis_id, position;
+                   DROP TABLE comments_old;"""
+            )
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            if version < 4:
+                conn.execute("INSERT INTO comments_fts (comments_fts) VALUES ('rebuild')")
+            _fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to LIKE: {e}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def delete_expired_analyses(ttl_hours: float = UNNAMED_ANALYSIS_TTL_HOURS) -> int:
+    """Delete unnamed analyses not updated within ``ttl_hours``; return how many were removed"""
+    with _connect() as conn:
+        cursor = conn.execute(
+            "DELETE FROM analyses WHERE name IS NULL AND updated_at < datetime('now', ?)",
+            (f"-{ttl_hours * 3600:.0f} seconds",),
+        )
+    return cursor.rowcount
+
+
+def delete_analysis(analysis_id: str) -> bool:
+    """Delete an analysis with all its comments; return False if it does not exist"""
+    with _connect() as conn:
+        cursor = conn.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+    return cursor.rowcount > 0
+
+
+def comment_hash(text: str) -> str:
+    """Identity of a comment, used to skip rows that were already analyzed"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _chunks(items: List[Any], size: int = _IN_CHUNK) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _row_to_comment(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "originalComment": row["original_comment"],
+        "summary": row["summary"],
+        "sentiment": row["sentiment"],
+        "sentimentScore": row["sentiment_score"],
+        "urgency": row["urgency"],
+        "clusterId": str(row["cluster_id"]),
+        "clusterSize": row["cluster_size"],
+    }
+
+
+class AnalysisNotFound(LookupError):
+    """Raised when an analysis is deleted while comments are appended to it"""
+
+
+def find_analysis(name: Optional[str]) -> Optional[str]:
+    """Return the id of the named session, or None if it does not exist yet or is unnamed"""
+    if not name:
+        return None
+    with _connect() as conn:
+        row = conn.execute("SELECT id FROM analyses WHERE name = ?", (name,)).fetchone()
+    return row["id"] if row else None
+
+
+def _create_analysis(conn: sqlite3.Connection, name: Optional[str]) -> str:
+    """Create an analysis, or return the named session if another upload created it first"""
+    analysis_id = uuid.uuid4().hex
+    conn.execute(
+        "INSERT INTO analyses (id, name, aggregates) VALUES (?, ?, ?) ON CONFLICT (name) DO NOTHING",
+        (analysis_id, name or None, json.dumps({})),
+    )
+    if name:
+        analysis_id = conn.execute("SELECT id FROM analyses WHERE name = ?", (name,)).fetchone()["id"]
+    return analysis_id
+
+
+def next_cluster_id(analysis_id: str) -> int:
+    """Return the lowest cluster id not yet stored for an analysis"""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT COALESCE(MAX(cluster_id) + 1, 0) FROM clusters WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()
+    return row[0]
+
+
+def seen_hash_counts(analysis_id: str, hashes: List[str]) -> Dict[str, int]:
+    """Return how often each of the given comment hashes is already stored"""
+    counts: Dict[str, int] = {}
+    unique = list(set(hashes))
+    with _connect() as conn:
+        for chunk in _chunks(unique):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"""SELECT comment_hash, COUNT(*) AS n FROM comments
+                    WHERE analysis_id = ? AND comment_hash IN ({placeholders})
+                    GROUP BY comment_hash""",
+                [analysis_id] + chunk,
+            ).fetchall()
+            counts.update((row["comment_hash"], row["n"]) for row in rows)
+    return counts
+
+
+def find_cluster_candidates(
+    analysis_id: str, band_keys: Iterable[Tuple[int, bytes]]
+) -> List[Tuple[int, bytes, int, str, str]]:
+    """
+    Return ``(band, band_key, cluster_id, representative_text, sentiment)``
+    for the stored clusters matching any of the given ``(band, band_key)`` pairs
+    """
+    results = []
+    with _connect() as conn:
+        # Two parameters per pair; stay below SQLite's default variable limit
+        for chunk in _chunks(list(band_keys), _IN_CHUNK // 2):
+            values = ",".join("(?, ?)" for _ in chunk)
+            params: List[Any] = []
+            for band, key in chunk:
+                params.extend([band, key])
+            params.append(analysis_id)
+            rows = conn.execute(
+                f"""WITH wanted (band, band_key) AS (VALUES {values})
+                    SELECT b.band, b.band_key, k.cluster_id, c.original_comment, c.sentiment
+                    FROM wanted w
+                    JOIN cluster_bands b ON b.analysis_id = ? AND b.band = w.band AND b.band_key = w.band_key
+                    JOIN clusters k ON k.analysis_id = b.analysis_id AND k.cluster_id = b.cluster_id
+                    JOIN comments c ON c.analysis_id = k.analysis_id AND c.position = k.representative_position""",
+                params,
+            ).fetchall()
+            results.extend(
+                (row["band"], row["band_key"], row["cluster_id"], row["original_comment"], row["sentiment"])
+                for row in rows
+            )
+    return results
+
+
+def get_cluster_results(analysis_id: str, cluster_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Return the stored summary and urgency of each cluster's representative"""
+    results: Dict[int, Dict[str, Any]] = {}
+    with _connect() as conn:
+        for chunk in _chunks(list(cluster_ids)):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"""SELECT k.cluster_id, c.summary, c.urgency
+                    FROM clusters k
+                    JOIN comments c ON c.analysis_id = k.analysis_id AND c.position = k.representative_position
+                    WHERE k.analysis_id = ? AND k.cluster_id IN ({placeholders})""",
+                [analysis_id] + chunk,
+            ).fetchall()
+            for row in rows:
+                results[row["cluster_id"]] = {"summary": row["summary"], "urgency": row["urgency"]}
+    return results
+
+
+def append_results(
+    analysis_id: Optional[str],
+    name: Optional[str],
+    results: Iterable[Dict[str, Any]],
+    first_cluster_id: int,
+    cluster_sizes: Dict[int, int],
+    new_clusters: Dict[int, List[bytes]],
+    representatives: Dict[int, int],
+    word_counts: Dict[bool, Dict[str, int]],
+    update_aggregates: Callable[[Optional[Dict[str, Any]], float, Dict[str, Any]], Tuple[Dict[str, Any], float]],
+    cluster_limit: int,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Append newly analyzed comments to an analysis and return its id and
+    updated aggregates.
+
+    Everything happens in one write transaction, so a failed upload leaves
+    no trace and concurrent uploads to the same session cannot collide:
+    positions and cluster ids are allocated here from what is stored. With
+    ``analysis_id`` None a new analysis called ``name`` is created, or
+    joined if a concurrent upload created it first; an existing analysis
+    that has been deleted in the meantime raises AnalysisNotFound. Each
+    of ``results`` carries its ``offset`` within the upload, its
+    ``commentHash`` and integer ``clusterId``; ids from ``first_cluster_id``
+    up are provisional and shifted past the stored clusters. Results are
+    consumed once, so they may be generated lazily.
+
+    ``cluster_sizes`` counts the new members per cluster; clusters in
+    ``new_clusters`` are stored with their LSH band keys and the offset of
+    their representative from ``representatives``. ``word_counts`` maps
+    ``sentiment_only`` to the word frequencies of the new comments.
+
+    ``update_aggregates(aggregates, score_sum, totals)`` is called once the
+    comments are written with the stored aggregates (None for a new
+    analysis) and score sum, and ``totals`` holding ``newComments``,
+    ``totalComments``, ``totalClusters`` and the ``cluster_limit`` largest
+    ``clusters``. It
+    returns the new aggregates and score sum, saved in the same transaction.
+    """
+    with _connect(immediate=True) as conn:
+        if analysis_id is None:
+            analysis_id = _create_analysis(conn, name)
+        elif conn.execute("SELECT 1 FROM analyses WHERE id = ?", (analysis_id,)).fetchone() is None:
+            raise AnalysisNotFound(analysis_id)
+
+        first_position = conn.execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM comments WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()[0]
+        shift = conn.execute(
+            "SELECT COALESCE(MAX(cluster_id) + 1, 0) FROM clusters WHERE analysis_id = ?", (analysis_id,)
+        ).fetchone()[0] - first_cluster_id
+
+        def stored_cluster_id(cluster_id: int) -> int:
+            return cluster_id + shift if cluster_id >= first_cluster_id else cluster_id
+
+        def comment_rows():
+            for r in results:
+                position = first_position + r["offset"]
+                yield (analysis_id, position, str(position), r["commentHash"], r["originalComment"], r["summary"],
+                       r["sentiment"], r["sentimentScore"], r["urgency"], stored_cluster_id(r["clusterId"]))
+
+        cursor = conn.executemany(
+            """INSERT INTO comments (analysis_id, position, id, comment_hash, original_comment, summary,
+                   sentiment, sentiment_score, urgency, cluster_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            comment_rows(),
+        )
+        new_comments = cursor.rowcount
+        conn.executemany(
+            "INSERT INTO clusters (analysis_id, cluster_id, representative_position, size) VALUES (?, ?, ?, 0)",
+            (
+                (analysis_id, stored_cluster_id(cluster_id), first_position + offset)
+                for cluster_id, offset in representatives.items()
+            ),
+        )
+        conn.executemany(
+            "UPDATE clusters SET size = size + ? WHERE analysis_id = ? AND cluster_id = ?",
+            ((size, analysis_id, stored_cluster_id(cluster_id)) for cluster_id, size in cluster_sizes.items()),
+        )
+        conn.executemany(
+            "INSERT INTO cluster_bands (analysis_id, band, band_key, cluster_id) VALUES (?, ?, ?, ?)",
+            (
+                (analysis_id, band, key, stored_cluster_id(cluster_id))
+                for cluster_id, keys in new_clusters.items()
+                for band, key in enumerate(keys)
+            ),
+        )
+        conn.executemany(
+            """INSERT INTO word_counts (analysis_id, sentiment_only, word, count) VALUES (?, ?, ?, ?)
+               ON CONFLICT (analysis_id, sentiment_only, word) DO UPDATE SET count = count + excluded.count""",
+            (
+                (analysis_id, int(sentiment_only), word, count)
+                for sentiment_only, counts in word_counts.items()
+                for word, count in counts.items()
+            ),
+        )
+
+        row = conn.execute("SELECT aggregates, score_sum FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        stored = json.loads(row["aggregates"]) or None
+        totals = {
+            "newComments": new_comments,
+            "totalComments": first_position + new_comments,
+            "totalClusters": first_cluster_id + shift + len(new_clusters),
+            "clusters": _largest_clusters(conn, analysis_id, cluster_limit),
+        }
+        aggregates, score_sum = update_aggregates(stored, row["score_sum"], totals)
+        conn.execute(
+            "UPDATE analyses SET aggregates = ?, score_sum = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (json.dumps(aggregates), score_sum, analysis_id),
+        )
+    return analysis_id, aggregates
+
+
+def save_word_cloud(analysis_id: str, word_cloud: Dict[str, Any]) -> None:
+    """Replace the word cloud in the stored aggregates of an analysis"""
+    with _connect(immediate=True) as conn:
+        row = conn.execute("SELECT aggregates FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        if row is None:
+            return
+        aggregates = json.loads(row["aggregates"])
+        aggregates["wordCloud"] = word_cloud
+        conn.execute("UPDATE analyses SET aggregates = ? WHERE id = ?", (json.dumps(aggregates), analysis_id))
+
+
+def top_words(analysis_id: str, sentiment_only: bool, limit: int) -> Dict[str, int]:
+    """Return the most frequent words of an analysis"""
+    with _connect() as conn:
+        rows = conn.execute(
+            """SELECT word, count FROM word_counts
+               WHERE analysis_id = ? AND sentiment_only = ?
+               ORDER BY count DESC LIMIT ?""",
+            (analysis_id, int(sentiment_only), limit),
+        ).fetchall()
+    return {row["word"]: row["count"] for row in rows}
+
+
+def _largest_clusters(conn: sqlite3.Connection, analysis_id: str, limit: int) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        """SELECT k.cluster_id, k.size, c.id AS representative_id
+           FROM clusters k
+           JOIN comments c ON c.analysis_id = k.analysis_id AND c.position = k.representative_position
+           WHERE k.analysis_id = ? AND k.size > 1
+           ORDER BY k.size DESC LIMIT ?""",
+        (analysis_id, limit),
+    ).fetchall()
+    return [
+        {"clusterId": str(row["cluster_id"]), "representativeId": row["representative_id"], "count": row["size"]}
+        for row in rows
+    ]
+
+
+def get_aggregates(analysis_id: str) -> Optional[Dict[str, Any]]:
+    """Return the stored aggregates of an analysis, or None if it does not exist or has none yet"""
+    with _connect() as conn:
+        row = conn.execute("SELECT aggregates FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+    return (json.loads(row["aggregates"]) or None) if row else None
+
+
+def list_sessions() -> List[Dict[str, Any]]:
+    """Return the named sessions, most recently updated first"""
+    with _connect() as conn:
+        rows = conn.execute(
+            """SELECT id, name, created_at, updated_at FROM analyses
+               WHERE name IS NOT NULL ORDER BY updated_at DESC"""
+        ).fetchall()
+    return [
+        {"analysisId": row["id"], "session": row["name"], "createdAt": row["created_at"], "updatedAt": row["updated_at"]}
+        for row in rows
+    ]
+
+
+def query_comments(
+    analysis_id: str,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    sentiment: Optional[str] = None,
+    urgency: Optional[str] = None,
+    search: Optional[str] = None,
+    sort: str = "position",
+    order: str = "asc",
+) -> Dict[str, Any]:
+    """Return one page of comments matching the given filters"""
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    sort_column = SORT_COLUMNS.get(sort, "c.position")
+    direction = "DESC" if order.lower() == "desc" else "ASC"
+
+    where = ["c.analysis_id = ?"]
+    params: List[Any] = [analysis_id]
+    if sentiment:
+        where.append("c.sentiment = ?")
+        params.append(sentiment.lower())
+    if urgency:
+        where.append("c.urgency = ?")
+        params.append(urgency)
+    if search and _fts_enabled and len(search) >= FTS_MIN_SEARCH_LENGTH:
+        where.append(
+            "c.row_id IN (SELECT rowid FROM comments_fts WHERE comments_fts MATCH ? AND analysis_id = ?)"
+        )
+        params.extend(['"' + search.replace('"', '""') + '"', analysis_id])
+    elif search:
+        # Too short for the trigram index; the analysis_id filter bounds the scan
+        where.append("(c.original_comment LIKE ? ESCAPE '\\' OR c.summary LIKE ? ESCAPE '\\')")
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params.extend([pattern, pattern])
+    where_sql = " AND ".join(where)
+
+    with _connect() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM comments c WHERE {where_sql}", params).fetchone()[0]
+        rows = conn.execute(
+            f"""SELECT c.*, k.size AS cluster_size FROM comments c
+                JOIN clusters k ON k.analysis_id = c.analysis_id AND k.cluster_id = c.cluster_id
+                WHERE {where_sql}
+                ORDER BY {sort_column} {direction}, c.position ASC
+                LIMIT ? OFFSET ?""",
+            params + [page_size, (page - 1) * page_size],
+        ).fetchall()
+
+    return {
+        "items": [_row_to_comment(row) for row in rows],
+        "page": page,
+        "pageSize": page_size,
+        "total": total,
+        "totalPages": (total + page_size - 1) // page_size,
+    }
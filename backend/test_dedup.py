@@ -0,0 +1,33 @@
+from dedup import NearDuplicateIndex, text_signature
+
+SUPPORT = "I strongly support the proposed amendment to section 12 because it protects small businesses."
+SUPPORT_EDITED = "I strongly support the proposed amendment to section 12, because it protects small businesses!"
+UNRELATED = "The consultation period is too short for rural stakeholders to respond properly."
+
+
+def test_near_duplicates_share_a_cluster():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add_all([SUPPORT, SUPPORT_EDITED, UNRELATED], ["positive"] * 3) == [0, 0, 1]
+    assert sorted(index.new_clusters) == [0, 1]
+
+
+def test_threshold_separates_partial_overlap():
+    # Shares roughly 80% of its shingles with SUPPORT
+    partial = "I strongly support the proposed amendment to section 12 because it protects small farmers and shops."
+    assert NearDuplicateIndex(threshold=0.9).add_all([SUPPORT, partial], ["", ""]) == [0, 1]
+    assert NearDuplicateIndex(threshold=0.7).add_all([SUPPORT, partial], ["", ""]) == [0, 0]
+
+
+def test_clusters_stay_within_a_group():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add_all([SUPPORT, SUPPORT, SUPPORT_EDITED], ["positive", "negative", "negative"]) == [0, 1, 1]
+
+
+def test_stored_clusters_are_matched_and_new_ids_follow_them():
+    stored = [
+        (band, key, 7, SUPPORT, "positive")
+        for band, key in enumerate(NearDuplicateIndex()._band_keys(text_signature(SUPPORT)))
+    ]
+    index = NearDuplicateIndex(threshold=0.8, first_cluster_id=8, lookup=lambda pairs: stored)
+    assert index.add_all([SUPPORT_EDITED, UNRELATED], ["positive", "positive"]) == [7, 8]
+    assert list(index.new_clusters) == [8]
@@ -1,26 +1,45 @@
 "use client"
 
+import { useEffect, useState } from "react"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import { Progress } from "@/components/ui/progress"
+import { Button } from "@/components/ui/button"
+import { Input } from "@/components/ui/input"
+import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { TrendingUp, TrendingDown, Minus, MessageSquare, FileText, Cloud, AlertTriangle, Clock, CheckCircle, XCircle } from "lucide-react"
 import { PieChart, Pie, Cell, ResponsiveContainer, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip } from "recharts"
 
+interface CommentSummary {
+  id: string
+  originalComment: string
+  summary: string
+  sentiment: "positive" | "negative" | "neutral"
+  sentimentScore: number
+  urgency: string
+  clusterId?: string
+  clusterSize?: number
+}
+
+interface PageInfo {
+  page: number
+  pageSize: number
+  total: number
+  totalPages: number
+}
+
 interface AnalysisData {
+  analysisId?: string
+  session?: string | null
+  newComments?: number
   sentimentAnalysis: {
     positive: number
     negative: number
     neutral: number
     totalComments: number
   }
-  summaries: Array<{
-    id: string
-    originalComment: string
-    summary: string
-    sentiment: "positive" | "negative" | "neutral"
-    sentimentScore: number
-    urgency: string
-  }>
+  summaries: CommentSummary[]
+  summariesPage?: PageInfo
   wordCloud: {
     image: string
     format: string
@@ -32,6 +51,15 @@ interface AnalysisData {
     notApplicable: number
   }
   averageSentimentScore: number
+  clusterAnalysis?: {
+    totalClusters: number
+    duplicateComments: number
+    clusters: Array<{
+      clusterId: string
+      representativeId: string
+      count: number
+    }>
+  }
 }
 
 interface AnalysisResultsProps {
@@ -39,7 +67,65 @@ interface AnalysisResultsProps {
 }
 
 export function AnalysisResults({ data }: AnalysisResultsProps) {
-  const { sentimentAnalysis, summaries, wordCloud, urgencyAnalysis, averageSentimentScore } = data
+  const { analysisId, sentimentAnalysis, wordCloud, urgencyAnalysis, averageSentimentScore } = data
+
+  const [summaries, setSummaries] = useState<CommentSummary[]>(data.summaries)
+  const [pageInfo, setPageInfo] = useState<PageInfo | undefined>(data.summariesPage)
+  const [page, setPage] = useState(1)
+  const [sentimentFilter, setSentimentFilter] = useState("all")
+  const [sortOrder, setSortOrder] = useState("position")
+  const [search, setSearch] = useState("")
+
+  useEffect(() => {
+    setPage(1)
+    setSentimentFilter("all")
+    setSortOrder("position")
+    setSearch("")
+  }, [data])
+
+  // Fetch further pages from the server-side result store
+  useEffect(() => {
+    const isFirstPage = page === 1 && sentimentFilter === "all" && sortOrder === "position" && !search.trim()
+    if (!analysisId || isFirstPage) {
+      // The initial response already carries the first unfiltered page
+      setSummaries(data.summaries)
+      setPageInfo(data.summariesPage)
+      return
+    }
+    const params = new URLSearchParams({ page: String(page) })
+    if (sentimentFilter !== "all") {
+      params.set("sentiment", sentimentFilter)
+    }
+    if (sortOrder !== "position") {
+      params.set("sort", "sentimentScore")
+      params.set("order", sortOrder === "score-desc" ? "desc" : "asc")
+    }
+    if (search.trim()) {
+      params.set("search", search.trim())
+    }
+
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(`/api/analyses/${analysisId}/comments?${params}`, { signal: controller.signal })
+        if (!response.ok) {
+          throw new Error("Failed to load comments")
+        }
+        const { items, ...info } = await response.json()
+        setSummaries(items)
+        setPageInfo(info)
+      } catch (error) {
+        if (!controller.signal.aborted) {
+          console.error("Error loading comments:", error)
+        }
+      }
+    }, 300)
+
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [analysisId, data, page, sentimentFilter, sortOrder, search])
 
   const sentimentData = [
     { name: "Positive", value: sentimentAnalysis.positive, color: "#10B981" },
@@ -262,8 +348,53 @@ export function AnalysisResults({ data }: AnalysisResultsProps) {
           </CardTitle>
         </CardHeader>
         <CardContent>
+          {analysisId && (
+            <div className="flex flex-col md:flex-row gap-3 mb-4">
+              <Input
+                placeholder="Search comments..."
+                value={search}
+                onChange={(e) => {
+                  setSearch(e.target.value)
+                  setPage(1)
+                }}
+              />
+              <Select
+                value={sentimentFilter}
+                onValueChange={(value) => {
+                  setSentimentFilter(value)
+                  setPage(1)
+                }}
+              >
+                <SelectTrigger className="md:w-44">
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">All sentiments</SelectItem>
+                  <SelectItem value="positive">Positive</SelectItem>
+                  <SelectItem value="negative">Negative</SelectItem>
+                  <SelectItem value="neutral">Neutral</SelectItem>
+                </SelectContent>
+              </Select>
+              <Select
+                value={sortOrder}
+                onValueChange={(value) => {
+                  setSortOrder(value)
+                  setPage(1)
+                }}
+              >
+                <SelectTrigger className="md:w-44">
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="position">Original order</SelectItem>
+                  <SelectItem value="score-desc">Highest score</SelectItem>
+                  <SelectItem value="score-asc">Lowest score</SelectItem>
+                </SelectContent>
+              </Select>
+            </div>
+          )}
           <div className="space-y-4">
-            {summaries.slice(0, 5).map((summary) => (
+            {(analysisId ? summaries : summaries.slice(0, 5)).map((summary) => (
               <div key={summary.id} className="p-4 border border-border rounded-lg space-y-3">
                 <div className="flex items-center justify-between">
                   <div className="flex items-center space-x-2">
@@ -301,6 +432,26 @@ export function AnalysisResults({ data }: AnalysisResultsProps) {
               </div>
             ))}
           </div>
+          {pageInfo && pageInfo.totalPages > 1 && (
+            <div className="flex items-center justify-between mt-4">
+              <span className="text-sm text-muted-foreground">
+                Page {pageInfo.page} of {pageInfo.totalPages} ({pageInfo.total} comments)
+              </span>
+              <div className="flex space-x-2">
+                <Button variant="outline" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+                  Previous
+                </Button>
+                <Button
+                  variant="outline"
+                  size="sm"
+                  disabled={page >= pageInfo.totalPages}
+                  onClick={() => setPage(page + 1)}
+                >
+                  Next
+                </Button>
+              </div>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
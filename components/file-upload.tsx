@@ -4,15 +4,17 @@ import { useState, useCallback } from "react"
 import { useDropzone } from "react-dropzone"
 import { Upload, FileText, Loader2 } from "lucide-react"
 import { Button } from "@/components/ui/button"
+import { Input } from "@/components/ui/input"
 import { Card, CardContent } from "@/components/ui/card"
 
 interface FileUploadProps {
-  onFileUpload: (file: File) => void
+  onFileUpload: (file: File, session?: string) => void
   isLoading: boolean
 }
 
 export function FileUpload({ onFileUpload, isLoading }: FileUploadProps) {
   const [uploadedFile, setUploadedFile] = useState<File | null>(null)
+  const [session, setSession] = useState("")
 
   const onDrop = useCallback((acceptedFiles: File[]) => {
     const file = acceptedFiles[0]
@@ -31,7 +33,7 @@ export function FileUpload({ onFileUpload, isLoading }: FileUploadProps) {
 
   const handleAnalyze = () => {
     if (uploadedFile) {
-      onFileUpload(uploadedFile)
+      onFileUpload(uploadedFile, session.trim() || undefined)
     }
   }
 
@@ -61,6 +63,17 @@ export function FileUpload({ onFileUpload, isLoading }: FileUploadProps) {
             </div>
           </div>
 
+          <div className="space-y-2">
+            <Input
+              placeholder="Session name (optional)"
+              value={session}
+              onChange={(e) => setSession(e.target.value)}
+            />
+            <p className="text-sm text-muted-foreground">
+              Re-upload a growing CSV under the same session name to analyze only the new comments
+            </p>
+          </div>
+
           {uploadedFile && (
             <div className="flex items-center justify-between p-4 bg-muted rounded-lg">
               <div className="flex items-center space-x-3">
@@ -0,0 +1,16 @@
+import http from "node:http"
+import https from "node:https"
+
+// Replace with your Colab ngrok URL
+const pythonBackendUrl = process.env.PYTHON_BACKEND_URL || "https://5a422dbe0527.ngrok-free.app/analyze"
+
+export const backendUrl = new URL(pythonBackendUrl)
+
+// Reuse connections to the Python backend across requests
+export const transport = backendUrl.protocol === "https:" ? https : http
+export const keepAliveAgent = new transport.Agent({ keepAlive: true, maxSockets: 16 })
+
+// Resolve another backend endpoint relative to the configured /analyze URL
+export function backendEndpoint(path: string): URL {
+  return new URL(backendUrl.pathname.replace(/\/analyze\/?$/, "") + path, backendUrl)
+}
@@ -8,7 +8,7 @@ import re
 import os
 
 def update_backend_url(new_url):
-    """Update the backend URL in the route.ts file"""
+    """Update the backend URL in the lib/backend.ts file"""
     
     # Ensure URL has proper format
     if not new_url.startswith('http'):
@@ -18,7 +18,7 @@ def update_backend_url(new_url):
         new_url = f"{new_url}/analyze"
     
     # File path
-    route_file = "app/api/analyze/route.ts"
+    route_file = "lib/backend.ts"
     
     if not os.path.exists(route_file):
         print(f"❌ File not found: {route_file}")